@@ -1,51 +1,95 @@
-import pandas as pd
-
-# Read existing geocoded schools data
-schools_df = pd.read_csv('schools_ofsted_london.csv')
-
-# Read Ofsted inspection data
-ofsted_df = pd.read_csv('data/State_funded_schools_inspections_and_outcomes_as_at_31_December_2024.csv', 
-                        low_memory=False, encoding='latin1')
-
-print(f"Ofsted data loaded: {len(ofsted_df)} schools")
-common_urns = set(schools_df['URN']).intersection(set(ofsted_df['URN']))
-print(f"Schools with Ofsted data: {len(common_urns)} out of {len(schools_df)}")
-
-# Ensure URN columns are the same type (int)
-schools_df['URN'] = schools_df['URN'].astype(int)
-ofsted_df['URN'] = ofsted_df['URN'].astype(int)
-
-# Select relevant columns from Ofsted data
-ofsted_subset = ofsted_df[['URN', 'Overall effectiveness', 'Inspection start date']].copy()
-
-# Remove duplicates (keep first inspection for each school)
-ofsted_subset = ofsted_subset.drop_duplicates(subset='URN', keep='first')
-
-# Merge on URN
-merged = pd.merge(schools_df, ofsted_subset, on='URN', how='left')
-
-# Map ratings to text labels (handle both numeric and string values)
-rating_map = {
-    '1': "Outstanding",
-    '2': "Good", 
-    '3': "Requires Improvement",
-    '4': "Inadequate",
-    1: "Outstanding",
-    2: "Good", 
-    3: "Requires Improvement",
-    4: "Inadequate",
-    'Not judged': "Not judged"
-}
-
-# Convert to string first to handle mixed types
-merged["Overall effectiveness"] = merged["Overall effectiveness"].astype(str)
-merged["Ofsted Rating"] = merged["Overall effectiveness"].map(rating_map)
-
-# Save updated CSV
-merged.to_csv('schools_ofsted_london_with_ratings.csv', index=False)
-
-# Show statistics
-print(f"Total schools: {len(merged)}")
-print(f"\nOfsted ratings breakdown:")
-print(merged["Ofsted Rating"].value_counts())
-print(f"\nSchools without rating: {merged['Ofsted Rating'].isna().sum()}")
\ No newline at end of file
+from common import RATING_MAP
+
+SCHOOLS_PATH = 'schools_ofsted_london.csv'
+OFSTED_PATH = 'data/State_funded_schools_inspections_and_outcomes_as_at_31_December_2024.csv'
+OUTPUT_PATH = 'schools_ofsted_london_with_ratings.csv'
+
+# Only these columns are decoded from the (very wide) Ofsted outcomes files
+OFSTED_COLUMNS = ['URN', 'Overall effectiveness', 'Inspection start date']
+CHUNK_SIZE = 50000
+
+
+def _clean_column(name):
+    # A UTF-8 byte order mark decoded as latin1 shows up as a prefix on the first header
+    return name.lstrip('\ufeff\xef\xbb\xbf').strip()
+
+
+def read_latest_inspections(ofsted_paths, urns, chunksize=CHUNK_SIZE):
+    """Stream Ofsted outcomes files and return the latest inspection for each of urns.
+
+    Rows for other schools are dropped chunk by chunk, so memory is bounded by
+    the number of URNs rather than by the size or number of the files.
+    """
+    import pandas as pd
+
+    if isinstance(ofsted_paths, str):
+        ofsted_paths = [ofsted_paths]
+    urns = set(int(urn) for urn in urns)
+
+    latest = None
+    rows_read = 0
+    for path in ofsted_paths:
+        reader = pd.read_csv(path, usecols=lambda c: _clean_column(c) in OFSTED_COLUMNS,
+                             dtype=str, encoding='latin1', chunksize=chunksize)
+        for chunk in reader:
+            rows_read += len(chunk)
+            chunk = chunk.rename(columns=_clean_column)
+            missing = set(OFSTED_COLUMNS) - set(chunk.columns)
+            if missing:
+                raise ValueError(f"{path} is missing required Ofsted column(s): {', '.join(sorted(missing))}")
+            chunk['URN'] = pd.to_numeric(chunk['URN'], errors='coerce')
+            chunk = chunk[chunk['URN'].isin(urns)].copy()
+            if chunk.empty:
+                continue
+            chunk['URN'] = chunk['URN'].astype(int)
+            chunk['inspected'] = pd.to_datetime(chunk['Inspection start date'], dayfirst=True, errors='coerce')
+
+            # Keep one row per URN: the latest dated inspection (later files win ties)
+            latest = chunk if latest is None else pd.concat([latest, chunk], ignore_index=True)
+            latest = latest.sort_values('inspected', kind='stable', na_position='first')
+            latest = latest.drop_duplicates(subset='URN', keep='last')
+
+    print(f"Ofsted data scanned: {rows_read} inspections in {len(ofsted_paths)} file(s)")
+    if latest is None:
+        return pd.DataFrame(columns=OFSTED_COLUMNS)
+    return latest[OFSTED_COLUMNS].sort_values('URN').reset_index(drop=True)
+
+
+def add_ofsted_ratings(schools_path=SCHOOLS_PATH, ofsted_path=OFSTED_PATH, output_path=OUTPUT_PATH):
+    """Attach the latest Ofsted overall effectiveness and inspection date to the geocoded schools.
+
+    ofsted_path may be a single outcomes file or a list of them (e.g. several years).
+    """
+    import pandas as pd
+
+    # Read existing geocoded schools data
+    schools_df = pd.read_csv(schools_path)
+    schools_df['URN'] = schools_df['URN'].astype(int)
+    # Replace any Ofsted columns left by an earlier run rather than suffixing them
+    schools_df = schools_df.drop(columns=['Overall effectiveness', 'Inspection start date', 'Ofsted Rating'],
+                                 errors='ignore')
+
+    # Latest Ofsted inspection for each of our schools
+    ofsted_subset = read_latest_inspections(ofsted_path, schools_df['URN'])
+    print(f"Schools with Ofsted data: {len(ofsted_subset)} out of {len(schools_df)}")
+
+    # Merge on URN
+    merged = pd.merge(schools_df, ofsted_subset, on='URN', how='left')
+
+    # Convert to string first to handle mixed types
+    merged["Overall effectiveness"] = merged["Overall effectiveness"].astype(str)
+    merged["Ofsted Rating"] = merged["Overall effectiveness"].map(RATING_MAP)
+
+    # Save updated CSV
+    merged.to_csv(output_path, index=False)
+
+    # Show statistics
+    print(f"Total schools: {len(merged)}")
+    print(f"\nOfsted ratings breakdown:")
+    print(merged["Ofsted Rating"].value_counts())
+    print(f"\nSchools without rating: {merged['Ofsted Rating'].isna().sum()}")
+    return merged
+
+
+if __name__ == '__main__':
+    add_ofsted_ratings()
@@ -0,0 +1,417 @@
+import gzip
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import sys
+
+from common import DEFAULT_POSTCODE, DEFAULT_RADIUS_MILES, METERS_PER_MILE, home_location, within_radius
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Build a static site from schools_london_complete.csv: one page per borough plus
+# an overview page, sharing JS/CSS and per-page JSON data files whose names carry
+# a content hash, so they can be cached for as long as the host allows without
+# ever going stale.
+
+SOURCE_CSV = 'schools_london_complete.csv'
+KS4_PATH = 'data/ks4_school_info_2024.csv'
+SITE_DIR = 'site'
+MANIFEST_NAME = '.build-manifest.json'
+
+# Files smaller than this are not worth pre-compressing
+MIN_COMPRESS_BYTES = 256
+
+CDN_HEAD = '''\
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.2.0/css/all.min.css"/>
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.css"/>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet.fullscreen@3.0.0/Control.FullScreen.css"/>
+    <script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js" defer></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.js" defer></script>
+    <script src="https://cdn.jsdelivr.net/npm/leaflet.fullscreen@3.0.0/Control.FullScreen.min.js" defer></script>'''
+
+STYLE_CSS = '''\
+html, body { width: 100%; height: 100%; margin: 0; padding: 0; font-family: sans-serif; }
+#map { position: absolute; top: 0; bottom: 0; right: 0; left: 0; }
+.leaflet-container { font-size: 1rem; }
+.nav { position: fixed; top: 10px; left: 60px; z-index: 9999; background: white;
+       border: 2px solid grey; border-radius: 5px; padding: 5px 10px; font-size: 14px; }
+.nav select { font-size: 14px; }
+.legend { position: fixed; bottom: 50px; right: 50px; width: 300px; z-index: 9999;
+          background: white; font-size: 14px; border: 2px solid grey;
+          border-radius: 5px; padding: 10px; }
+.legend h4 { margin: 0; }
+.legend p { margin: 3px; }
+.legend .small { margin: 2px; font-size: 12px; }
+'''
+
+APP_JS = '''\
+(function () {
+  'use strict';
+
+  // Colors based on Progress 8 scores, mirroring visualize_complete.py
+  function schoolColor(p8) {
+    if (p8 === null) return 'lightgray';
+    if (p8 >= 1.0) return 'purple';
+    if (p8 >= 0.5) return 'green';
+    if (p8 >= -0.5) return 'blue';
+    if (p8 >= -1.0) return 'orange';
+    return 'red';
+  }
+
+  function distanceMeters(a, b) {
+    var rad = Math.PI / 180;
+    var dLat = (b[0] - a[0]) * rad;
+    var dLon = (b[1] - a[1]) * rad;
+    var h = Math.sin(dLat / 2) * Math.sin(dLat / 2) +
+      Math.cos(a[0] * rad) * Math.cos(b[0] * rad) * Math.sin(dLon / 2) * Math.sin(dLon / 2);
+    return 6371008.8 * 2 * Math.asin(Math.sqrt(h));
+  }
+
+  function escapeHtml(s) {
+    return String(s).replace(/[&<>"']/g, function (c) {
+      return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+    });
+  }
+
+  function signed(x, digits) {
+    return (x >= 0 ? '+' : '') + x.toFixed(digits);
+  }
+
+  function render(data) {
+    var home = data.home;
+    var map = L.map('map').setView(home, 12);
+    L.tileLayer('https://tile.openstreetmap.org/{z}/{x}/{y}.png', {
+      maxZoom: 19,
+      attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+    }).addTo(map);
+
+    L.marker(home, {icon: L.AwesomeMarkers.icon({icon: 'home', prefix: 'fa', markerColor: 'red'})})
+      .bindPopup('Home (' + escapeHtml(data.home_label) + ')')
+      .bindTooltip('Home Location')
+      .addTo(map);
+    L.circle(home, {radius: data.radius_m, color: 'crimson', fill: false, weight: 2, opacity: 0.5})
+      .bindPopup(data.radius_miles + ' mile radius')
+      .addTo(map);
+
+    var schools = L.featureGroup();
+    var highPerforming = L.featureGroup();
+    var bounds = [];
+
+    data.schools.forEach(function (s) {
+      var loc = [s.lat, s.lon];
+      var meters = distanceMeters(home, loc);
+      var rating = s.ofsted || 'No rating';
+      var name = escapeHtml(s.name);
+      var popup = '<b>' + name + '</b><br>' +
+        '<b>\\ud83d\\udccd Distance from home: ' + meters.toFixed(0) + 'm (' +
+        (meters / 1609.344).toFixed(1) + ' miles)</b><br>' +
+        'URN: ' + s.urn + '<br>' +
+        '<b>Ofsted Rating: ' + escapeHtml(rating) + '</b><br>';
+      var tooltip = [s.name, rating];
+      if (s.p8 !== null) {
+        popup += '<b>\\ud83d\\udcca Progress 8: ' + signed(s.p8, 2) + ' (' + escapeHtml(s.p8_band) + ')</b><br>';
+        tooltip.push('P8: ' + signed(s.p8, 2));
+      } else {
+        popup += '<i>Progress 8: No data available</i><br>';
+      }
+      if (s.att8 !== null) {
+        popup += '<b>\\ud83d\\udcc8 Attainment 8: ' + signed(s.att8, 1) + '</b><br>';
+      }
+      if (s.inspected) {
+        popup += '<br>Last Inspection: ' + escapeHtml(s.inspected);
+      }
+      tooltip.push(meters.toFixed(0) + 'm');
+
+      var excellent = s.p8 !== null && s.p8 > 1.0;
+      var icon = L.AwesomeMarkers.icon({
+        icon: excellent ? 'star' : 'graduation-cap',
+        prefix: 'fa',
+        markerColor: schoolColor(s.p8)
+      });
+      L.marker(loc, {icon: icon})
+        .bindPopup(popup, {maxWidth: 350})
+        .bindTooltip(escapeHtml(tooltip.join(' | ')))
+        .addTo(excellent ? highPerforming : schools);
+      bounds.push(loc);
+    });
+
+    schools.addTo(map);
+    highPerforming.addTo(map);
+    L.control.layers(null, {
+      'Schools': schools,
+      'High Progress 8 (>1.0)': highPerforming
+    }).addTo(map);
+    L.control.fullscreen().addTo(map);
+    if (data.fit_bounds && bounds.length) {
+      map.fitBounds(bounds, {padding: [30, 30]});
+    }
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var nav = document.getElementById('borough-nav');
+    if (nav) {
+      nav.addEventListener('change', function () { window.location.href = nav.value; });
+    }
+    var el = document.getElementById('map');
+    fetch(el.getAttribute('data-src'))
+      .then(function (r) { return r.json(); })
+      .then(render);
+  });
+})();
+'''
+
+LEGEND_HTML = '''\
+<div class="legend">
+<h4>GCSE Progress 8 Performance</h4>
+<hr>
+<h5>Progress 8 Color Coding:</h5>
+<p><i class="fa fa-star" style="color:purple;"></i> Excellent (+1.0 and above)</p>
+<p><i class="fa fa-graduation-cap" style="color:green;"></i> Above Average (+0.5 to +1.0)</p>
+<p><i class="fa fa-graduation-cap" style="color:blue;"></i> Average (-0.5 to +0.5)</p>
+<p><i class="fa fa-graduation-cap" style="color:orange;"></i> Below Average (-1.0 to -0.5)</p>
+<p><i class="fa fa-graduation-cap" style="color:red;"></i> Well Below Average (-1.0 and below)</p>
+<p><i class="fa fa-graduation-cap" style="color:lightgray;"></i> No Progress 8 Data</p>
+<hr>
+<h5>What is Progress 8?</h5>
+<p class="small">Measures how much progress students make from KS2 to GCSE compared to similar students nationally</p>
+<p class="small">0 = Average progress</p>
+<p class="small">+1.0 = Students make 1 grade more progress than average</p>
+<hr>
+<p><i class="fa fa-home" style="color:red;"></i> Home ({home_label})</p>
+</div>'''
+
+PAGE_HTML = '''\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+    <title>{title}</title>
+{cdn_head}
+    <link rel="stylesheet" href="{css_url}"/>
+    <script src="{js_url}" defer></script>
+</head>
+<body>
+<div class="nav">
+<label for="borough-nav">Borough:</label>
+<select id="borough-nav">
+{options}
+</select>
+</div>
+{legend}
+<div id="map" data-src="{data_url}"></div>
+</body>
+</html>
+'''
+
+
+def content_hash(data):
+    """Short hex digest used in asset file names and the build manifest"""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def write_compressed(path, data, missing_only=False):
+    """Write gzip and brotli encoded siblings of path"""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return
+    encoders = [('.gz', lambda d: gzip.compress(d, compresslevel=9, mtime=0))]  # mtime=0 keeps .gz reproducible
+    if brotli is not None:
+        encoders.append(('.br', lambda d: brotli.compress(d, quality=11)))
+    for suffix, encode in encoders:
+        if missing_only and os.path.exists(path + suffix):
+            continue
+        with open(path + suffix, 'wb') as f:
+            f.write(encode(data))
+
+
+def write_file(path, data):
+    """Write bytes to path along with gzip and brotli encoded siblings"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    write_compressed(path, data)
+
+
+def write_hashed(site_dir, subdir, stem, ext, data):
+    """Write data under a content-hashed name and return its site-relative URL.
+
+    An existing file is left untouched, since the name already guarantees the
+    content, but any compressed sibling it lacks is still written.
+    """
+    url = f"{subdir}/{stem}.{content_hash(data)}.{ext}"
+    path = os.path.join(site_dir, url)
+    if os.path.exists(path):
+        write_compressed(path, data, missing_only=True)
+    else:
+        write_file(path, data)
+    return url
+
+
+def load_schools():
+    """Read the complete school data and attach the local authority (borough)"""
+    import pandas as pd
+
+    df = pd.read_csv(SOURCE_CSV)
+    ks4 = pd.read_csv(KS4_PATH, usecols=['school_urn', 'la_name'])
+    ks4 = ks4.drop_duplicates(subset='school_urn')
+    df = pd.merge(df, ks4, left_on='URN', right_on='school_urn', how='left')
+    df = df.drop('school_urn', axis=1).rename(columns={'la_name': 'Borough'})
+
+    # Schools without KS4 data take the borough of the nearest school that has one
+    known = df[df['Borough'].notna()]
+    for idx, row in df[df['Borough'].isna()].iterrows():
+        d2 = ((known['Latitude'] - row['Latitude']) ** 2 +
+              ((known['Longitude'] - row['Longitude']) * math.cos(math.radians(row['Latitude']))) ** 2)
+        df.at[idx, 'Borough'] = known.loc[d2.idxmin(), 'Borough']
+    return df
+
+
+def school_records(df):
+    """Convert rows into the compact records consumed by app.js"""
+    import pandas as pd
+
+    def value(x, digits=None):
+        if pd.isna(x):
+            return None
+        return round(float(x), digits) if digits is not None else str(x)
+
+    records = []
+    for _, row in df.sort_values('EstablishmentName').iterrows():
+        records.append({
+            'name': row['EstablishmentName'],
+            'urn': int(row['URN']),
+            'lat': round(float(row['Latitude']), 6),
+            'lon': round(float(row['Longitude']), 6),
+            'ofsted': value(row['Ofsted Rating']),
+            'inspected': value(row['Inspection start date']),
+            'p8': value(row['diffn_p8mea'], 2),
+            'p8_band': value(row['p8_banding']),
+            'att8': value(row['diffn_att8'], 1),
+        })
+    return records
+
+
+def encode_json(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+
+def render_page(title, page_name, pages, css_url, js_url, data_url, home_label):
+    """Render a page; text from the data or the command line is HTML-escaped"""
+    options = []
+    for name, label in pages:
+        selected = ' selected' if name == page_name else ''
+        options.append(f'<option value="{html.escape(name)}"{selected}>{html.escape(label)}</option>')
+    page = PAGE_HTML.format(
+        title=html.escape(title),
+        cdn_head=CDN_HEAD,
+        css_url=css_url,
+        js_url=js_url,
+        data_url=data_url,
+        options='\n'.join(options),
+        legend=LEGEND_HTML.format(home_label=html.escape(home_label)),
+    )
+    return page.encode('utf-8')
+
+
+def load_manifest(site_dir):
+    path = os.path.join(site_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def prune(site_dir, keep, dropped_pages):
+    """Remove hashed assets no longer referenced by any page, and pages no longer built.
+
+    Only pages recorded in an earlier manifest are removed, so other HTML files
+    in site_dir (e.g. the folium maps rendered there by the Pages workflow) stay.
+    """
+    removed = 0
+    for fname in os.listdir(site_dir):
+        if re.sub(r'\.(gz|br)$', '', fname) in dropped_pages:
+            os.remove(os.path.join(site_dir, fname))
+            removed += 1
+    for subdir in ('assets', 'data'):
+        folder = os.path.join(site_dir, subdir)
+        if not os.path.isdir(folder):
+            continue
+        for fname in os.listdir(folder):
+            base = re.sub(r'\.(gz|br)$', '', fname)
+            if f"{subdir}/{base}" not in keep:
+                os.remove(os.path.join(folder, fname))
+                removed += 1
+    return removed
+
+
+def build(site_dir=SITE_DIR, force=False, postcode=DEFAULT_POSTCODE, radius_miles=None):
+    """Build the site into site_dir, skipping pages whose inputs are unchanged"""
+    home = home_location(postcode)
+    df = load_schools()
+    # An explicit radius narrows the schools down; by default keep every school
+    # the locate stage selected
+    if radius_miles is None:
+        radius_miles = DEFAULT_RADIUS_MILES
+    else:
+        df = df[within_radius(home, df['Latitude'], df['Longitude'], radius_miles)]
+    old_manifest = {} if force else load_manifest(site_dir)
+
+    css_url = write_hashed(site_dir, 'assets', 'style', 'css', STYLE_CSS.encode('utf-8'))
+    js_url = write_hashed(site_dir, 'assets', 'app', 'js', APP_JS.encode('utf-8'))
+
+    # (page file, title, schools, fit map to schools)
+    page_specs = [('index.html', 'All London schools', df, False)]
+    for borough in sorted(df['Borough'].unique()):
+        page_specs.append((f"{slugify(borough)}.html", borough, df[df['Borough'] == borough], True))
+    nav = [(page, label) for page, label, _, _ in page_specs]
+
+    manifest = {}
+    built = skipped = 0
+    for page, label, schools, fit_bounds in page_specs:
+        data = encode_json({
+            'home': list(home),
+            'home_label': postcode,
+            'radius_miles': radius_miles,
+            'radius_m': radius_miles * METERS_PER_MILE,
+            'fit_bounds': fit_bounds,
+            'schools': school_records(schools),
+        })
+        data_url = write_hashed(site_dir, 'data', slugify(label), 'json', data)
+
+        # Rendering is cheap; only writing and compressing unchanged pages is skipped
+        title = f"Secondary schools - {label}"
+        page_html = render_page(title, page, nav, css_url, js_url, data_url, postcode)
+        key = content_hash(page_html)
+        manifest[page] = {'key': key, 'data': data_url}
+        path = os.path.join(site_dir, page)
+        if old_manifest.get(page, {}).get('key') == key and os.path.exists(path):
+            write_compressed(path, page_html, missing_only=True)
+            skipped += 1
+            continue
+        write_file(path, page_html)
+        built += 1
+
+    keep = {css_url, js_url} | {entry['data'] for entry in manifest.values()}
+    removed = prune(site_dir, keep, set(load_manifest(site_dir)) - set(manifest))
+    with open(os.path.join(site_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Site built in '{site_dir}/': {built} pages written, {skipped} unchanged, {removed} stale files removed")
+    if brotli is None:
+        print("brotli is not installed - only gzip versions were written (pip install brotli)")
+    return manifest
+
+
+if __name__ == '__main__':
+    build(force='--force' in sys.argv[1:])
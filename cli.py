@@ -0,0 +1,164 @@
+import argparse
+import csv
+import sys
+
+from common import DEFAULT_POSTCODE, DEFAULT_RADIUS_MILES, METERS_PER_MILE, haversine_meters, home_location
+
+# Single entry point for every pipeline stage and map variant.
+# Each subcommand imports only the modules it needs, so quick lookups such as
+# `python cli.py nearby` or `search` never pay for pandas, folium or geopy.
+
+COMPLETE_CSV = 'schools_london_complete.csv'
+
+MAP_VARIANTS = {
+    'basic': 'visualize_schools',
+    'ofsted': 'visualize_schools_with_ofsted',
+    'catchments': 'visualize_with_catchments',
+    'complete': 'visualize_complete',
+}
+
+
+def cmd_locate(args):
+    from schools_ofsted_london import find_schools
+    find_schools(postcode=args.postcode, radius_miles=args.radius)
+
+
+def cmd_ofsted(args):
+    from add_ofsted_ratings import OFSTED_PATH, add_ofsted_ratings
+    add_ofsted_ratings(ofsted_path=args.ofsted_paths or OFSTED_PATH)
+
+
+def cmd_gcse(args):
+    from add_gcse_data import add_gcse_data
+    add_gcse_data()
+
+
+def cmd_map(args):
+    import importlib
+    module = importlib.import_module(MAP_VARIANTS[args.variant])
+    kwargs = {'postcode': args.postcode, 'radius_miles': args.radius}
+    if args.output:
+        kwargs['output_path'] = args.output
+    module.build_map(**kwargs)
+
+
+def cmd_build_site(args):
+    from build_site import build
+    build(site_dir=args.site_dir, force=args.force, postcode=args.postcode, radius_miles=args.radius)
+
+
+def nearby_schools(home, radius_miles, path=COMPLETE_CSV):
+    """Return schools within radius_miles of home, closest first, as (meters, row) pairs"""
+    max_meters = radius_miles * METERS_PER_MILE
+    results = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            try:
+                school_loc = (float(row['Latitude']), float(row['Longitude']))
+            except ValueError:
+                continue
+            meters = haversine_meters(home, school_loc)
+            if meters <= max_meters:
+                results.append((meters, row))
+    results.sort(key=lambda x: x[0])
+    return results
+
+
+def cmd_nearby(args):
+    if args.lat is not None:
+        home, label = (args.lat, args.lon), f"{args.lat}, {args.lon}"
+    else:
+        home, label = home_location(args.postcode), args.postcode
+    results = nearby_schools(home, args.radius)
+    print(f"{len(results)} schools within {args.radius:g} miles of {label}")
+    for meters, row in results[:args.limit]:
+        rating = row.get('Ofsted Rating') or 'No rating'
+        p8 = row.get('diffn_p8mea')
+        p8_text = f" | P8: {float(p8):+.2f}" if p8 else ""
+        print(f"  {meters:6.0f}m  {row['EstablishmentName']} ({rating}{p8_text})")
+
+
+def cmd_build_index(args):
+    from search_index import build_index
+    build_index()
+
+
+def cmd_search(args):
+    from search_index import load_index, search
+    results = search(load_index(), ' '.join(args.query), limit=args.limit)
+    for score, urn, name, postcode, address in results:
+        print(f"  {score:.3f}  {name} (URN {urn}) {address or postcode}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="London secondary schools data pipeline and maps")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    location = argparse.ArgumentParser(add_help=False)
+    location.add_argument('--postcode', default=DEFAULT_POSTCODE, help=f"home postcode (default: {DEFAULT_POSTCODE})")
+    location.add_argument('--radius', type=float, default=DEFAULT_RADIUS_MILES,
+                          help=f"only include schools within this many miles (default: {DEFAULT_RADIUS_MILES})")
+
+    # Maps and the site draw the radius and, only when it is given, filter by it
+    display = argparse.ArgumentParser(add_help=False)
+    display.add_argument('--postcode', default=DEFAULT_POSTCODE, help=f"home postcode (default: {DEFAULT_POSTCODE})")
+    display.add_argument('--radius', type=float,
+                         help=f"only show schools within this many miles and draw that circle "
+                              f"(default: all located schools, {DEFAULT_RADIUS_MILES} mile circle)")
+
+    p = subparsers.add_parser('locate', parents=[location],
+                              help="geocode GIAS secondary schools within the radius")
+    p.set_defaults(func=cmd_locate)
+
+    p = subparsers.add_parser('ofsted', help="add Ofsted ratings to the located schools")
+    p.add_argument('ofsted_paths', nargs='*', metavar='OFSTED_CSV',
+                   help="Ofsted outcomes file(s); the latest inspection across all of them is used")
+    p.set_defaults(func=cmd_ofsted)
+
+    p = subparsers.add_parser('gcse', help="add KS4 Progress 8 / Attainment 8 data")
+    p.set_defaults(func=cmd_gcse)
+
+    p = subparsers.add_parser('map', parents=[display], help="render a folium map")
+    p.add_argument('variant', choices=sorted(MAP_VARIANTS))
+    p.add_argument('-o', '--output', help="output HTML file (default depends on the variant)")
+    p.set_defaults(func=cmd_map)
+
+    p = subparsers.add_parser('build-site', parents=[display], help="build the static site")
+    p.add_argument('--site-dir', default='site')
+    p.add_argument('--force', action='store_true', help="rebuild pages even if unchanged")
+    p.set_defaults(func=cmd_build_site)
+
+    p = subparsers.add_parser('nearby', parents=[location], help="list schools near the home postcode")
+    p.add_argument('--lat', type=float, help="home latitude (skips geocoding; requires --lon)")
+    p.add_argument('--lon', type=float, help="home longitude")
+    p.add_argument('-n', '--limit', type=int, default=20)
+    p.set_defaults(func=cmd_nearby)
+
+    p = subparsers.add_parser('build-index', help="rebuild the fuzzy search index")
+    p.set_defaults(func=cmd_build_index)
+
+    p = subparsers.add_parser('search', help="fuzzy search by school name, postcode or address")
+    p.add_argument('query', nargs='+')
+    p.add_argument('-n', '--limit', type=int, default=10)
+    p.set_defaults(func=cmd_search)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'nearby' and (args.lat is None) != (args.lon is None):
+        parser.error("--lat and --lon must be given together")
+    try:
+        args.func(args)
+    except Exception as e:
+        # geopy is only imported by subcommands that geocode, so look it up lazily
+        geopy_exc = sys.modules.get('geopy.exc')
+        if isinstance(e, ValueError) or (geopy_exc and isinstance(e, geopy_exc.GeocoderServiceError)):
+            parser.exit(2, f"error: {e}\n")
+        raise
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import math
+
+# Shared defaults and helpers. This module must stay free of heavy imports
+# (pandas, folium, geopy) so that quick CLI commands start fast.
+
+# Local GIAS establishment data (all schools in England)
+GIAS_PATH = "data/edubasealldata.csv"
+
+DEFAULT_POSTCODE = "N16 7RJ"
+DEFAULT_RADIUS_MILES = 10
+
+# Known coordinates for the default postcode, used instead of geocoding it
+DEFAULT_HOME = (51.5645, -0.0759)
+
+METERS_PER_MILE = 1609.344
+
+# Map numeric Ofsted grades to text labels (handle both numeric and string values)
+RATING_MAP = {
+    '1': "Outstanding",
+    '2': "Good",
+    '3': "Requires Improvement",
+    '4': "Inadequate",
+    1: "Outstanding",
+    2: "Good",
+    3: "Requires Improvement",
+    4: "Inadequate",
+    'Not judged': "Not judged"
+}
+
+_geolocator = None
+
+
+def get_geolocator():
+    """Return a shared Nominatim geocoder, importing geopy on first use"""
+    global _geolocator
+    if _geolocator is None:
+        from geopy.geocoders import Nominatim
+        _geolocator = Nominatim(user_agent="school_locator")
+    return _geolocator
+
+
+def geocode(query):
+    """Return (lat, lon) for a free-text query, or (None, None) if it cannot be found"""
+    try:
+        loc = get_geolocator().geocode(query)
+        if loc:
+            return (loc.latitude, loc.longitude)
+    except Exception:
+        pass
+    return (None, None)
+
+
+def home_location(postcode=DEFAULT_POSTCODE):
+    """Return (lat, lon) for the home postcode.
+
+    Raises ValueError if the postcode cannot be found; geopy errors (network
+    failures, rate limits) propagate unchanged.
+    """
+    if postcode.replace(" ", "").upper() == DEFAULT_POSTCODE.replace(" ", ""):
+        return DEFAULT_HOME
+    loc = get_geolocator().geocode(f"{postcode}, UK")
+    if not loc:
+        raise ValueError(f"Could not geocode postcode {postcode}")
+    return (loc.latitude, loc.longitude)
+
+
+def haversine_meters(a, b):
+    """Great-circle distance in meters between two (lat, lon) points"""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371008.8 * 2 * math.asin(math.sqrt(h))
+
+
+def within_radius(home, latitudes, longitudes, radius_miles):
+    """Boolean mask of the points within radius_miles of home"""
+    max_meters = radius_miles * METERS_PER_MILE
+    return [haversine_meters(home, (lat, lon)) <= max_meters for lat, lon in zip(latitudes, longitudes)]
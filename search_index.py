@@ -0,0 +1,200 @@
+import csv
+import heapq
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+
+from common import GIAS_PATH
+
+# Trigram inverted index over school names, postcodes and addresses for fast
+# fuzzy lookups ("Mossbourne Vic", "Skinners"). Built from the national GIAS
+# establishment list when it is available (otherwise the KS4 school list), plus
+# any schools in the complete London data that it lacks, and saved as JSON next
+# to the dataset so searches don't have to re-read the CSVs.
+
+KS4_PATH = 'data/ks4_school_info_2024.csv'
+COMPLETE_CSV = 'schools_london_complete.csv'
+INDEX_PATH = 'data/school_search_index.json'
+INDEX_VERSION = 2
+
+FIELDS = ('name', 'postcode', 'address')
+# Name matches rank above postcode matches, which rank above address matches
+FIELD_WEIGHTS = {'name': 1.0, 'postcode': 0.9, 'address': 0.6}
+# Share of each field's score that comes from how much of the query it contains,
+# the rest being overall (Dice) similarity. Containment keeps a misspelt word
+# matching long multi-word names; addresses are long, so they use it alone.
+CONTAINMENT_SHARE = {'name': 0.5, 'postcode': 0.0, 'address': 1.0}
+
+# GIAS address parts, joined into a single address field
+GIAS_ADDRESS_COLUMNS = ['Street', 'Locality', 'Address3', 'Town', 'Postcode']
+# Extra score when the whole query appears verbatim in the school name
+SUBSTRING_BONUS = 0.25
+# How many top trigram matches per requested result are checked for the bonus
+CANDIDATE_FACTOR = 10
+
+POSTCODE_RE = re.compile(r'\b([A-Z]{1,2}[0-9][0-9A-Z]?)\s*([0-9][A-Z]{2})\b', re.IGNORECASE)
+
+
+def normalize(text):
+    """Lowercase, strip accents and apostrophes, and collapse everything else to single spaces"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"['’]", '', text)
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def trigrams(text):
+    """Distinct character trigrams of each word, padded so word starts and ends count"""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def postcode_trigrams(text):
+    """Trigrams of a postcode with its spaces removed, so E97HD matches E9 7HD"""
+    return trigrams(normalize(text).replace(' ', ''))
+
+
+def extract_postcode(address):
+    match = POSTCODE_RE.search(address or '')
+    if not match:
+        return ''
+    return f"{match.group(1)} {match.group(2)}".upper()
+
+
+def source_signature(paths):
+    """Size and modification time of each source, used to detect a stale index"""
+    signature = {}
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature[path] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def read_schools(gias_path=GIAS_PATH, ks4_path=KS4_PATH, complete_path=COMPLETE_CSV):
+    """Return [urn, name, postcode, address] rows, one per URN"""
+    docs = []
+    seen = set()
+    if os.path.exists(gias_path):
+        with open(gias_path, newline='', encoding='latin1') as f:
+            for row in csv.DictReader(f):
+                urn = row['URN']
+                if urn in seen or not urn.isdigit():
+                    continue
+                seen.add(urn)
+                address = ', '.join(row[c] for c in GIAS_ADDRESS_COLUMNS if row.get(c))
+                docs.append([int(urn), row['EstablishmentName'], row['Postcode'].strip().upper(), address])
+    elif os.path.exists(ks4_path):
+        with open(ks4_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                urn = row['school_urn']
+                if urn in seen:
+                    continue
+                seen.add(urn)
+                address = row['full_address']
+                docs.append([int(urn), row['school_name'], extract_postcode(address), address])
+    if os.path.exists(complete_path):
+        with open(complete_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                urn = row['URN']
+                if urn in seen:
+                    continue
+                seen.add(urn)
+                docs.append([int(urn), row['EstablishmentName'], '', ''])
+    return docs
+
+
+def field_trigrams(field, text):
+    return postcode_trigrams(text) if field == 'postcode' else trigrams(text)
+
+
+def build_index(gias_path=GIAS_PATH, ks4_path=KS4_PATH, complete_path=COMPLETE_CSV, path=INDEX_PATH):
+    """Build the trigram index from the source CSVs and save it to path"""
+    docs = read_schools(gias_path, ks4_path, complete_path)
+    postings = {field: {} for field in FIELDS}
+    sizes = {field: [] for field in FIELDS}
+    for doc_id, doc in enumerate(docs):
+        for field, text in zip(FIELDS, doc[1:]):
+            grams = field_trigrams(field, text)
+            sizes[field].append(len(grams))
+            for gram in grams:
+                postings[field].setdefault(gram, []).append(doc_id)
+
+    index = {
+        'version': INDEX_VERSION,
+        'sources': source_signature([gias_path, ks4_path, complete_path]),
+        'docs': docs,
+        'postings': postings,
+        'sizes': sizes,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+    print(f"Search index saved as '{path}' - {len(docs)} schools")
+    return index
+
+
+def load_index(path=INDEX_PATH, gias_path=GIAS_PATH, ks4_path=KS4_PATH, complete_path=COMPLETE_CSV):
+    """Load the saved index, rebuilding it if it is missing or older than its sources"""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            index = json.load(f)
+        if (index.get('version') == INDEX_VERSION and
+                index.get('sources') == source_signature([gias_path, ks4_path, complete_path])):
+            return index
+    return build_index(gias_path, ks4_path, complete_path, path)
+
+
+def search(index, query, limit=10):
+    """Return up to limit (score, urn, name, postcode, address) matches, best first.
+
+    Each field blends the Dice coefficient between its trigrams and the
+    query's with the fraction of query trigrams it contains (see
+    CONTAINMENT_SHARE), weighted by FIELD_WEIGHTS; a school's score is its
+    best field.
+    """
+    if not trigrams(query):
+        return []
+    scores = {}
+    for field in FIELDS:
+        query_grams = field_trigrams(field, query)
+        postings = index['postings'][field]
+        sizes = index['sizes'][field]
+        hits = Counter()
+        for gram in query_grams:
+            hits.update(postings.get(gram, ()))
+        weight = FIELD_WEIGHTS[field]
+        share = CONTAINMENT_SHARE[field]
+        for doc_id, count in hits.items():
+            dice = 2 * count / (len(query_grams) + sizes[doc_id])
+            containment = count / len(query_grams)
+            score = weight * (share * containment + (1 - share) * dice)
+            if score > scores.get(doc_id, 0):
+                scores[doc_id] = score
+
+    # Only the leading candidates can be lifted into the results by the bonus
+    docs = index['docs']
+    needle = normalize(query)
+    candidates = heapq.nlargest(limit * CANDIDATE_FACTOR, scores.items(), key=lambda x: x[1])
+    candidates = [(doc_id, score + SUBSTRING_BONUS if needle in normalize(docs[doc_id][1]) else score)
+                  for doc_id, score in candidates]
+
+    ranked = sorted(candidates, key=lambda x: (-x[1], docs[x[0]][1]))[:limit]
+    return [(round(score, 3), *docs[doc_id]) for doc_id, score in ranked]
+
+
+if __name__ == '__main__':
+    index = load_index()
+    query = ' '.join(sys.argv[1:]) or 'Mossbourne Vic'
+    start = time.perf_counter()
+    results = search(index, query)
+    print(f"{len(results)} matches for '{query}' in {(time.perf_counter() - start) * 1000:.1f}ms")
+    for score, urn, name, postcode, address in results:
+        print(f"  {score:.3f}  {name} (URN {urn}) {postcode}")
@@ -1,66 +1,86 @@
-import pandas as pd
-import folium
-from folium import plugins
-
-# Read the CSV data
-df = pd.read_csv('schools_ofsted_london.csv')
-
-# Create a map centered around the average of all school coordinates
-center_lat = df['Latitude'].mean()
-center_lon = df['Longitude'].mean()
-
-# Create the map
-m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
-
-# Add home location marker (N16 7RJ)
-home_lat = 51.5645
-home_lon = -0.0759
-folium.Marker(
-    [home_lat, home_lon],
-    popup='Home (N16 7RJ)',
-    tooltip='Home Location',
-    icon=folium.Icon(color='red', icon='home', prefix='fa')
-).add_to(m)
-
-# Add a circle to show the 10-mile radius
-folium.Circle(
-    radius=16093.4,  # 10 miles in meters
-    location=[home_lat, home_lon],
-    popup='10 mile radius',
-    color='crimson',
-    fill=False,
-).add_to(m)
-
-# Add school markers
-for idx, row in df.iterrows():
-    # Create popup text with school info
-    popup_text = f"""
-    <b>{row['EstablishmentName']}</b><br>
-    URN: {row['URN']}
-    """
-    
-    # Add marker for each school
+from common import DEFAULT_POSTCODE, DEFAULT_RADIUS_MILES, METERS_PER_MILE, home_location, within_radius
+
+INPUT_PATH = 'schools_ofsted_london.csv'
+OUTPUT_PATH = 'schools_map.html'
+
+
+def build_map(input_path=INPUT_PATH, output_path=OUTPUT_PATH,
+              postcode=DEFAULT_POSTCODE, radius_miles=None):
+    """Plot every school as a plain marker, with a clustered layer for zoomed-out views"""
+    import pandas as pd
+    import folium
+    from folium import plugins
+
+    # Read the CSV data
+    df = pd.read_csv(input_path)
+
+    home_lat, home_lon = home_location(postcode)
+    # An explicit radius narrows the schools down; by default keep every school
+    # the locate stage selected
+    if radius_miles is None:
+        radius_miles = DEFAULT_RADIUS_MILES
+    else:
+        df = df[within_radius((home_lat, home_lon), df['Latitude'], df['Longitude'], radius_miles)]
+
+    # Create a map centered around the average of all school coordinates
+    center_lat = df['Latitude'].mean()
+    center_lon = df['Longitude'].mean()
+
+    # Create the map
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
+
+    # Add home location marker
     folium.Marker(
-        [row['Latitude'], row['Longitude']],
-        popup=folium.Popup(popup_text, max_width=300),
-        tooltip=row['EstablishmentName'],
-        icon=folium.Icon(color='blue', icon='graduation-cap', prefix='fa')
+        [home_lat, home_lon],
+        popup=f'Home ({postcode})',
+        tooltip='Home Location',
+        icon=folium.Icon(color='red', icon='home', prefix='fa')
     ).add_to(m)
 
-# Add marker cluster for better visualization when zoomed out
-marker_cluster = plugins.MarkerCluster().add_to(m)
+    # Add a circle to show the search radius
+    folium.Circle(
+        radius=radius_miles * METERS_PER_MILE,
+        location=[home_lat, home_lon],
+        popup=f'{radius_miles:g} mile radius',
+        color='crimson',
+        fill=False,
+    ).add_to(m)
 
-for idx, row in df.iterrows():
-    folium.Marker(
-        [row['Latitude'], row['Longitude']],
-        popup=f"{row['EstablishmentName']}",
-        tooltip=row['EstablishmentName']
-    ).add_to(marker_cluster)
-
-# Add fullscreen button
-plugins.Fullscreen().add_to(m)
-
-# Save the map
-m.save('schools_map.html')
-print(f"Map saved as 'schools_map.html' - {len(df)} schools plotted")
-print("Open the file in your browser to view the interactive map")
\ No newline at end of file
+    # Add school markers
+    for idx, row in df.iterrows():
+        # Create popup text with school info
+        popup_text = f"""
+        <b>{row['EstablishmentName']}</b><br>
+        URN: {row['URN']}
+        """
+
+        # Add marker for each school
+        folium.Marker(
+            [row['Latitude'], row['Longitude']],
+            popup=folium.Popup(popup_text, max_width=300),
+            tooltip=row['EstablishmentName'],
+            icon=folium.Icon(color='blue', icon='graduation-cap', prefix='fa')
+        ).add_to(m)
+
+    # Add marker cluster for better visualization when zoomed out
+    marker_cluster = plugins.MarkerCluster().add_to(m)
+
+    for idx, row in df.iterrows():
+        folium.Marker(
+            [row['Latitude'], row['Longitude']],
+            popup=f"{row['EstablishmentName']}",
+            tooltip=row['EstablishmentName']
+        ).add_to(marker_cluster)
+
+    # Add fullscreen button
+    plugins.Fullscreen().add_to(m)
+
+    # Save the map
+    m.save(output_path)
+    print(f"Map saved as '{output_path}' - {len(df)} schools plotted")
+    print("Open the file in your browser to view the interactive map")
+    return m
+
+
+if __name__ == '__main__':
+    build_map()